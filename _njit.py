@@ -0,0 +1,17 @@
+"""
+Optional Numba support.
+
+Kernels are decorated with @njit(cache=True, nogil=True). Without Numba
+installed the decorator is a no-op and the same functions run as plain
+Python.
+"""
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        # Support both @njit and @njit(...)
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        def decorator(func):
+            return func
+        return decorator
@@ -1,6 +1,11 @@
 import streamlit as st
 import pandas as pd
-from data_loader import fetch_data
+import numpy as np
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from data_loader import fetch_data_batch
 from strategy import MeasuredMoveStrategy
 from market_data import get_index_constituents, get_timeframe_params
 from visualization import plot_interactive_chart
@@ -37,7 +42,7 @@ st.markdown("""
     }
     
     /* Buttons - Apple Blue Pill */
-    .stButton > button {
+    .stButton > button, .stFormSubmitButton > button {
         background-color: #0071e3;
         color: white;
         border: none;
@@ -48,7 +53,7 @@ st.markdown("""
         transition: all 0.2s ease;
     }
     
-    .stButton > button:hover {
+    .stButton > button:hover, .stFormSubmitButton > button:hover {
         background-color: #0077ed;
         transform: scale(1.02);
     }
@@ -115,82 +120,208 @@ else:
 timeframe = st.sidebar.selectbox("Timeframe", ["1m", "5m", "15m", "30m", "1h", "4h", "1d", "1w"], index=6) # Default 1d
 period, interval = get_timeframe_params(timeframe)
 
-# 3. Strategy Parameters
-st.sidebar.subheader("Strategy Settings")
+# Settings below live in a form, so dragging a slider does not rerun the
+# whole script; everything is applied at once when "Run Scan" is pressed
+with st.sidebar.form("config"):
+    # 3. Strategy Parameters
+    st.subheader("Strategy Settings")
+    
+    # Dynamic Defaults based on Timeframe
+    default_multiplier = 6.0
+    default_min_bars = 20
+    
+    if timeframe in ["1m", "5m", "15m", "30m"]:
+        default_multiplier = 8.0 # Higher sensitivity threshold for noise
+        default_min_bars = 50 # Require longer structures
+    
+    atr_multiplier = st.slider("ATR Multiplier (Sensitivity)", 1.0, 10.0, default_multiplier, 0.5)
+    min_bars = st.slider("Min Bars Duration", 5, 100, default_min_bars, 1)
+    strict_fib = st.checkbox("Smart Recognition (Fibonacci 0.382-0.786)", True)
+    use_ema_filter = st.checkbox("Trend Filter (200 EMA)", False, help="Only show Bullish > EMA and Bearish < EMA")
+    
+    # 4. Filtering
+    st.subheader("Filter Results")
+    max_proximity = st.slider("Max Distance from Target (Point D) %", 0.0, 20.0, 5.0, 0.5)
+    show_all = st.checkbox("Show All (Ignore Filter)", False)
+    
+    submitted = st.form_submit_button("Run Scan")
+
+# --- Main Analysis ---
+# Downloads only depend on (symbols, period, interval), so reruns that just
+# change strategy settings can reuse them. Intraday bars expire faster.
+# The download time is returned with the data so every layer above can
+# judge freshness by how old the bars are, not by when it last looked.
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_data_cached(chunk: tuple, period: str, interval: str) -> tuple:
+    data = fetch_data_batch(list(chunk), period=period, interval=interval)
+    return time.time(), data
+
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_intraday_cached(chunk: tuple, period: str, interval: str) -> tuple:
+    data = fetch_data_batch(list(chunk), period=period, interval=interval)
+    return time.time(), data
 
-# Dynamic Defaults based on Timeframe
-default_multiplier = 6.0
-default_min_bars = 20
+def fetch_chunk(chunk: tuple, period: str, interval: str) -> tuple:
+    """Returns (download time, Symbol -> DataFrame) from the matching data cache."""
+    fetch = fetch_intraday_cached if interval.endswith("m") else fetch_data_cached
+    return fetch(chunk, period, interval)
 
-if timeframe in ["1m", "5m", "15m", "30m"]:
-    default_multiplier = 8.0 # Higher sensitivity threshold for noise
-    default_min_bars = 50 # Require longer structures
+def analyze_chunk(chunk: tuple, fetched_at: float, period: str, interval: str, atr_multiplier: float, min_bars: int, strict_fib: bool, use_ema_filter: bool) -> dict:
+    """
+    Fetches a chunk of symbols in one request and runs the strategy on each.
+    Runs on a worker thread, so it must not draw any Streamlit elements.
+    
+    Args:
+        fetched_at (float): Download time of the data being analyzed. Only
+            part of the cache key, so a new download is never answered with
+            an analysis of the previous one.
+    
+    Returns:
+        dict: Symbol -> {'df', 'pivots', 'moves', 'fetched_at'}
+    """
+    fetched_at, data = fetch_chunk(chunk, period, interval)
+    analysis = {}
+    for symbol, df in data.items():
+        try:
+            strategy = MeasuredMoveStrategy(symbol, df)
+            strategy.analyze(atr_multiplier=atr_multiplier, min_bars=min_bars, strict_fib=strict_fib, use_ema_filter=use_ema_filter)
+            analysis[symbol] = {'df': df, 'pivots': strategy.pivots, 'moves': strategy.get_active_moves(), 'fetched_at': fetched_at}
+        except Exception as e:
+            # A bad symbol should not drop the rest of its chunk
+            continue
+    return analysis
 
-atr_multiplier = st.sidebar.slider("ATR Multiplier (Sensitivity)", 1.0, 10.0, default_multiplier, 0.5)
-min_bars = st.sidebar.slider("Min Bars Duration", 5, 100, default_min_bars, 1)
-strict_fib = st.sidebar.checkbox("Smart Recognition (Fibonacci 0.382-0.786)", True)
-use_ema_filter = st.sidebar.checkbox("Trend Filter (200 EMA)", False, help="Only show Bullish > EMA and Bearish < EMA")
+# The analysis is deterministic for a given data set and settings, so it is
+# cached too. The result filters (max_proximity, show_all) are applied
+# afterwards and never invalidate it.
+@st.cache_data(ttl=3600, show_spinner=False)
+def run_strategy(chunk: tuple, fetched_at: float, period: str, interval: str, atr_multiplier: float, min_bars: int, strict_fib: bool, use_ema_filter: bool) -> dict:
+    return analyze_chunk(chunk, fetched_at, period, interval, atr_multiplier, min_bars, strict_fib, use_ema_filter)
 
-# 4. Filtering
-st.sidebar.subheader("Filter Results")
-max_proximity = st.sidebar.slider("Max Distance from Target (Point D) %", 0.0, 20.0, 5.0, 0.5)
-show_all = st.sidebar.checkbox("Show All (Ignore Filter)", False)
+@st.cache_data(ttl=60, show_spinner=False)
+def run_intraday_strategy(chunk: tuple, fetched_at: float, period: str, interval: str, atr_multiplier: float, min_bars: int, strict_fib: bool, use_ema_filter: bool) -> dict:
+    return analyze_chunk(chunk, fetched_at, period, interval, atr_multiplier, min_bars, strict_fib, use_ema_filter)
 
-# --- Main Analysis ---
-if st.sidebar.button("Run Scan"):
-    results = []
+# Yahoo serves up to ~20 tickers per request
+SCAN_CHUNK_SIZE = 20
+
+RESULT_COLUMNS = ["Symbol", "Direction", "Price", "Entry (C)", "Target (D)", "Dist to Target %"]
+
+if submitted:
+    # One light row per pattern for the table, plus the heavy plotting data
+    # stored once per symbol rather than copied into every row
+    flat_rows = []
+    per_symbol = {}
+    pattern_options = {}
     progress_bar = st.progress(0)
     status_text = st.empty()
     
-    for i, symbol in enumerate(symbols):
-        status_text.text(f"Analyzing {symbol}...")
-        progress_bar.progress((i + 1) / len(symbols))
+    # Symbols already analyzed with the same settings in this session are
+    # reused, so only new or changed symbols hit the network. Entries expire
+    # by the age of their download, matching the data cache TTL.
+    intraday = interval.endswith("m")
+    params_hash = hashlib.sha256(json.dumps({
+        'p': period, 'i': interval, 'a': atr_multiplier, 'm': min_bars, 'f': strict_fib, 'e': use_ema_filter
+    }, sort_keys=True).encode()).hexdigest()
+    max_age = 60 if intraday else 3600
+    now = time.time()
+    symbol_cache = st.session_state.setdefault('symbol_cache', {})
+    
+    def is_fresh(cached):
+        return cached is not None and cached['params_hash'] == params_hash and now - cached['fetched_at'] < max_age
+    
+    entries = {s: symbol_cache[s] for s in symbols if is_fresh(symbol_cache.get(s))}
+    pending = [s for s in symbols if s not in entries]
+    chunks = [tuple(pending[i:i + SCAN_CHUNK_SIZE]) for i in range(0, len(pending), SCAN_CHUNK_SIZE)]
+    scan = run_intraday_strategy if intraday else run_strategy
+    done = 0
+    last_ui = 0.0
+    
+    # Downloads are I/O bound, so threads overlap the network waits
+    with ThreadPoolExecutor(max_workers=max(1, min(32, len(chunks)))) as executor:
+        def scan_chunk(c):
+            # Cheap cache hit when the data is still fresh; the download time
+            # then selects the analysis of exactly that download
+            fetched_at, _ = fetch_chunk(c, period, interval)
+            return scan(c, fetched_at, period, interval, atr_multiplier, min_bars, strict_fib, use_ema_filter)
         
-        try:
-            df = fetch_data(symbol, period=period, interval=interval)
-            strategy = MeasuredMoveStrategy(symbol, df)
-            strategy.analyze(atr_multiplier=atr_multiplier, min_bars=min_bars, strict_fib=strict_fib, use_ema_filter=use_ema_filter)
+        futures = {executor.submit(scan_chunk, c): c for c in chunks}
+        
+        for future in as_completed(futures):
+            done += len(futures[future])
             
-            moves = strategy.get_active_moves()
+            # Each update is a websocket message, so refresh at most every 200ms
+            ui_now = time.monotonic()
+            if ui_now - last_ui > 0.2 or done == len(pending):
+                status_text.text(f"Analyzed {done}/{len(pending)} symbols...")
+                progress_bar.progress(done / len(pending))
+                last_ui = ui_now
             
-            for move in moves:
-                # Filter logic - NOW USING PROXIMITY TO D
-                if show_all or (move.proximity_to_d_pct * 100 <= max_proximity):
-                    results.append({
-                        "Symbol": symbol,
-                        "Direction": move.direction,
-                        "Price": move.current_price_at_analysis,
-                        "Entry (C)": move.end_price,
-                        "Target (D)": move.projected_target,
-                        "Dist to Target %": move.proximity_to_d_pct * 100,
-                        "Object": move, # Store object for plotting
-                        "DataFrame": df,
-                        "Pivots": strategy.pivots,
-                        "Moves": moves # All moves for this symbol
-                    })
-                    
-        except Exception as e:
-            # st.error(f"Error analyzing {symbol}: {e}")
-            pass
+            try:
+                analysis = future.result()
+            except Exception as e:
+                # st.error(f"Error fetching {futures[future]}: {e}")
+                continue
+            
+            for symbol, entry in analysis.items():
+                symbol_cache[symbol] = entries[symbol] = dict(entry, params_hash=params_hash)
+                
+    for symbol in symbols:
+        entry = entries.get(symbol)
+        if entry is None:
+            continue # Failed to fetch or analyze
+            
+        moves = entry['moves']
+        
+        # Filter logic - NOW USING PROXIMITY TO D
+        # One vector compare per symbol; rejected moves are never touched again
+        proximity = np.fromiter((m.proximity_to_d_pct for m in moves), dtype=np.float64, count=len(moves))
+        mask = np.ones(len(moves), dtype=bool) if show_all else (proximity * 100 <= max_proximity)
+        
+        for idx in np.flatnonzero(mask):
+            move = moves[idx]
+            flat_rows.append({
+                "Symbol": symbol,
+                "Direction": move.direction,
+                "Price": move.current_price_at_analysis,
+                "Entry (C)": move.end_price,
+                "Target (D)": move.projected_target,
+                "Dist to Target %": proximity[idx] * 100
+            })
+            
+        if mask.any():
+            per_symbol[symbol] = (entry['df'], entry['pivots'], moves) # All moves for this symbol
+            pattern_options[symbol] = ["All Patterns"] + [f"Pattern {i+1}: {m.direction} (Target {m.projected_target:.2f})" for i, m in enumerate(moves)]
             
     progress_bar.empty()
     status_text.empty()
     
     # Store in session state
-    st.session_state['scan_results'] = results
+    # Build the table once from primitive rows with a fixed column order
+    st.session_state['scan_results'] = pd.DataFrame.from_records(flat_rows, columns=RESULT_COLUMNS)
+    st.session_state['per_symbol'] = per_symbol
+    # Dropdown options are fixed until the next scan
+    st.session_state['symbol_options'] = tuple(per_symbol) # Symbols with results, in scan order
+    st.session_state['pattern_options'] = pattern_options
+    st.session_state['scan_params_hash'] = params_hash
     st.session_state['scan_performed'] = True
 
 # --- Display Results ---
+# Rebuilding the Plotly figure is the main cost of a dropdown rerun, so
+# figures are cached by symbol, data, settings and pattern selection.
+# Underscored arguments are not hashed by Streamlit.
+@st.cache_resource(max_entries=64, show_spinner=False)
+def build_chart(symbol: str, df_hash: str, params_hash: str, moves_sig: tuple, _df, _pivots, _moves):
+    return plot_interactive_chart(_df, _pivots, _moves, symbol)
+
 if st.session_state.get('scan_performed', False):
-    results = st.session_state['scan_results']
+    res_df = st.session_state['scan_results']
     
-    if not results:
+    if res_df.empty:
         st.warning("No patterns found matching criteria.")
     else:
-        st.success(f"Found {len(results)} opportunities!")
+        st.success(f"Found {len(res_df)} opportunities!")
         
-        # Convert to DataFrame for display
-        res_df = pd.DataFrame(results)
         display_cols = ["Symbol", "Direction", "Price", "Target (D)", "Dist to Target %"]
         
         # Interactive Table
@@ -205,20 +336,14 @@ if st.session_state.get('scan_performed', False):
         
         # Let user select which symbol to view from the results
         # Use a key to ensure state persistence if needed, though selectbox usually handles it
-        symbol_options = res_df["Symbol"].unique()
-        selected_symbol = st.selectbox("Select Symbol to View Chart", symbol_options)
+        selected_symbol = st.selectbox("Select Symbol to View Chart", st.session_state['symbol_options'])
         
         if selected_symbol:
             # Get data for this symbol
-            # We might have multiple rows for the same symbol if multiple patterns, 
-            # but they share the same DF and Pivots usually.
-            # Just take the first one to get the plotting data.
-            row = res_df[res_df["Symbol"] == selected_symbol].iloc[0]
+            df, pivots, moves = st.session_state['per_symbol'][selected_symbol]
             
             # Let user select specific pattern
-            moves = row["Moves"]
-            pattern_options = ["All Patterns"] + [f"Pattern {i+1}: {m.direction} (Target {m.projected_target:.2f})" for i, m in enumerate(moves)]
-            selected_pattern_idx = st.selectbox("Select Pattern to View", pattern_options)
+            selected_pattern_idx = st.selectbox("Select Pattern to View", st.session_state['pattern_options'][selected_symbol])
             
             moves_to_plot = moves
             if selected_pattern_idx != "All Patterns":
@@ -237,11 +362,17 @@ if st.session_state.get('scan_performed', False):
                 - **Retracement Ratio**: {m.retracement_pct:.1%} (Fibonacci Check)
                 """)
             
-            fig = plot_interactive_chart(
-                row["DataFrame"], 
-                row["Pivots"], 
-                moves_to_plot, 
-                selected_symbol
+            # Cheap fingerprints instead of hashing the frame and move objects
+            df_hash = f"{df.index[-1].value}:{len(df)}"
+            moves_sig = tuple((m.direction, m.start_price, m.mid_price, m.end_price, m.projected_target) for m in moves_to_plot)
+            fig = build_chart(
+                selected_symbol, 
+                df_hash, 
+                st.session_state['scan_params_hash'], 
+                moves_sig, 
+                df, 
+                pivots, 
+                moves_to_plot
             )
             st.plotly_chart(fig, use_container_width=True)
             
@@ -1,11 +1,14 @@
+import matplotlib
+matplotlib.use('Agg') # Charts are only saved to files; skip GUI backend setup
 import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+from matplotlib.collections import LineCollection
 import pandas as pd
 from data_loader import fetch_data
 from strategy import MeasuredMoveStrategy
-import os
 
 # List of major stocks and indices
-SYMBOLS = [
+SYMBOLS = (
     "^GSPC", # S&P 500
     "^DJI",  # Dow Jones Industrial Average
     "^IXIC", # Nasdaq Composite
@@ -16,29 +19,40 @@ SYMBOLS = [
     "GOOGL", # Alphabet
     "META",  # Meta
     "TSLA"   # Tesla
-]
+)
 
 def plot_results(df, pivots, moves, symbol, filename):
     plt.figure(figsize=(14, 7))
     plt.plot(df.index, df['close'], label='Close Price', color='black', alpha=0.6, linewidth=1)
     
     # Plot Pivots
-    pivot_dates = pivots.dropna().index
-    pivot_values = pivots.dropna().values
+    pivot_points = pivots.dropna()
+    pivot_dates = pivot_points.index
+    pivot_values = pivot_points.values
     plt.plot(pivot_dates, pivot_values, color='blue', linestyle='--', linewidth=1, label='ZigZag Pivots')
     plt.scatter(pivot_dates, pivot_values, color='red', s=20, zorder=5)
     
     # Plot Measured Moves
-    for move in moves:
-        color = 'green' if move.direction == "Bullish" else 'red'
-        
-        # Draw the A-B-C lines
-        plt.plot([move.start_idx, move.mid_idx, move.end_idx], 
-                 [move.start_price, move.mid_price, move.end_price], 
-                 color=color, linewidth=2)
+    # All A-B-C paths go into one LineCollection and all targets into one
+    # hlines call instead of one artist per move
+    ax = plt.gca()
+    colors = ['green' if move.direction == "Bullish" else 'red' for move in moves]
+    
+    if moves:
+        segments = [
+            [(mdates.date2num(move.start_idx), move.start_price),
+             (mdates.date2num(move.mid_idx), move.mid_price),
+             (mdates.date2num(move.end_idx), move.end_price)]
+            for move in moves
+        ]
+        ax.add_collection(LineCollection(segments, colors=colors, linewidths=2))
+        ax.autoscale_view()
         
         # Draw Projection (C to Target)
-        plt.axhline(y=move.projected_target, color=color, linestyle=':', alpha=0.8)
+        ax.hlines([move.projected_target for move in moves], df.index[0], df.index[-1],
+                  colors=colors, linestyles=':', alpha=0.8)
+        
+    for move, color in zip(moves, colors):
         plt.text(df.index[-1], move.projected_target, f"Target: {move.projected_target:.2f}", 
                  color=color, verticalalignment='center')
         
@@ -65,7 +79,7 @@ def run_batch():
         try:
             print(f"\nAnalyzing {symbol}...")
             # Fetch Data (5 years for global context)
-            df = fetch_data(symbol, period="5y")
+            df = fetch_data(symbol, period="5y", use_disk_cache=True)
             
             # Run Strategy
             # Using global settings: Multiplier 6.0, Min Bars 20
@@ -99,10 +113,8 @@ def run_batch():
     print("=" * 60)
     
     if results:
-        print(f"{'Symbol':<10} | {'Direction':<10} | {'Price':<10} | {'Target':<10}")
-        print("-" * 50)
-        for res in results:
-            print(f"{res['Symbol']:<10} | {res['Direction']:<10} | {res['Current Price']:<10.2f} | {res['Target']:<10.2f}")
+        summary = pd.DataFrame(results, columns=["Symbol", "Direction", "Current Price", "Target"])
+        print(summary.to_string(index=False, float_format="{:.2f}".format))
     else:
         print("No active patterns found across all symbols.")
 
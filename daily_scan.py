@@ -1,9 +1,9 @@
 import argparse
 import pandas as pd
 from datetime import datetime
-from data_loader import fetch_data
-from strategy import MeasuredMoveStrategy
-from market_data import DOW_30, NASDAQ_100
+from data_loader import fetch_data_batch
+from strategy import scan_all
+from market_data import SCAN_UNIVERSE
 from report_generator import generate_html_report
 import time
 
@@ -14,40 +14,35 @@ def run_daily_scan(proximity_threshold: float = 5.0):
     """
     print(f"Starting Daily Scan: {datetime.now()}")
     
-    # Combine lists and remove duplicates
-    symbols = list(set(DOW_30 + NASDAQ_100))
+    symbols = SCAN_UNIVERSE
     print(f"Scanning {len(symbols)} symbols...")
     
     results = []
     
-    for i, symbol in enumerate(symbols):
-        print(f"[{i+1}/{len(symbols)}] Analyzing {symbol}...", end="\r")
-        try:
-            # Use default global settings: 5y daily data
-            df = fetch_data(symbol, period="5y", interval="1d")
-            strategy = MeasuredMoveStrategy(symbol, df)
-            # Default strategy settings
-            strategy.analyze(atr_multiplier=6.0, min_bars=20, strict_fib=True)
-            
-            moves = strategy.get_active_moves()
-            
-            for move in moves:
-                # Filter by Proximity to D
-                if move.proximity_to_d_pct * 100 <= proximity_threshold:
-                    results.append({
-                        "Symbol": symbol,
-                        "Direction": move.direction,
-                        "Price": move.current_price_at_analysis,
-                        "Target (D)": move.projected_target,
-                        "Dist to Target %": move.proximity_to_d_pct * 100,
-                        "DataFrame": df,
-                        "Pivots": strategy.pivots,
-                        "Moves": [move] # Just pass this specific move for clarity in report? Or all? Let's pass all for context.
-                    })
-                    
-        except Exception as e:
-            # print(f"Error {symbol}: {e}")
-            pass
+    # One batched request for the whole universe instead of one per symbol
+    # Use default global settings: 5y daily data
+    data = fetch_data_batch(symbols, period="5y", interval="1d", use_disk_cache=True)
+    print(f"Fetched data for {len(data)}/{len(symbols)} symbols.")
+    
+    # Default strategy settings
+    analyzed = scan_all(data, atr_multiplier=6.0, min_bars=20, strict_fib=True)
+    print(f"Analyzed {len(analyzed)}/{len(data)} symbols.")
+    
+    for symbol, strategy in analyzed.items():
+        # Filter by Proximity to D
+        table = strategy.get_moves_table()
+        hits = table.slice(table.proximity_to_d_pct * 100 <= proximity_threshold)
+        for move in hits:
+            results.append({
+                "Symbol": symbol,
+                "Direction": move.direction,
+                "Price": move.current_price_at_analysis,
+                "Target (D)": move.projected_target,
+                "Dist to Target %": move.proximity_to_d_pct * 100,
+                "DataFrame": data[symbol],
+                "Pivots": strategy.pivots,
+                "Moves": [move] # Just pass this specific move for clarity in report? Or all? Let's pass all for context.
+            })
             
     print(f"\nScan Complete. Found {len(results)} opportunities.")
     
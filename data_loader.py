@@ -1,6 +1,152 @@
 import yfinance as yf
 import pandas as pd
+import functools
+import hashlib
+import os
+import threading
+import time
+from datetime import date
+from pathlib import Path
 
+# Copy-on-Write lets pandas share column memory instead of making
+# defensive copies. It is always on from pandas 3.0, where the option is
+# deprecated.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.options.mode.copy_on_write = True
+
+# One session shared by every download so scans reuse pooled connections
+# instead of paying a TLS handshake per request. Recent yfinance talks to
+# Yahoo through curl_cffi, which needs browser impersonation.
+try:
+    from curl_cffi import requests as curl_requests
+    _SESSION = curl_requests.Session(impersonate="chrome")
+except ImportError:
+    import requests
+    from requests.adapters import HTTPAdapter
+    _SESSION = requests.Session()
+    _SESSION.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=3))
+
+# Daily (and longer) bars can be cached on disk for the rest of the day, so
+# re-running a batch scan does not download the same history again.
+# The cache is opt-in (use_disk_cache=True): during market hours the last
+# daily bar is the live price, so interactive callers such as the app must
+# not see the day's first download until midnight.
+# Intraday bars change too quickly to be cached this way.
+# Caching at the HTTP layer (requests-cache) is not an option: yfinance
+# rejects caching sessions and talks to Yahoo through curl_cffi anyway.
+CACHE_DIR = Path("cache")
+CACHE_MAX_FILES = 500
+CACHED_INTERVALS = {"1d", "5d", "1wk", "1mo", "3mo"}
+
+# The app fetches from many threads at once; only one of them evicts at a time
+_EVICT_LOCK = threading.Lock()
+
+# Empty downloads are usually a transient Yahoo hiccup rather than a
+# missing symbol, so they are retried a few times with backoff.
+DOWNLOAD_ATTEMPTS = 3
+RETRY_BACKOFF = 0.5
+
+def _backoff(attempt: int):
+    """Sleeps 0.5s, 1s, ... before retry number attempt + 1."""
+    time.sleep(RETRY_BACKOFF * (2 ** attempt))
+
+def _download(tickers: str, attempts: int = DOWNLOAD_ATTEMPTS, **kwargs) -> pd.DataFrame:
+    """Calls yf.download, retrying while the result comes back empty."""
+    for attempt in range(attempts):
+        df = yf.download(tickers, progress=False, session=_SESSION, **kwargs)
+        if not df.empty or attempt == attempts - 1:
+            return df
+        _backoff(attempt)
+
+def _cache_path(symbol: str, period: str, interval: str) -> Path:
+    key = hashlib.md5(f"{symbol}|{period}|{interval}|{date.today().isoformat()}".encode()).hexdigest()
+    return CACHE_DIR / f"{key}.parquet"
+
+def _read_cache(path: Path):
+    """Returns the cached frame, or None on a miss."""
+    if not path.exists():
+        return None
+    try:
+        df = pd.read_parquet(path)
+    except Exception:
+        # Corrupt file or no parquet engine; fall back to downloading
+        return None
+    try:
+        os.utime(path) # Mark as recently used for eviction
+    except FileNotFoundError:
+        pass # Evicted in the meantime; the frame is already loaded
+    return df
+
+def _write_cache(path: Path, df: pd.DataFrame):
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        df.to_parquet(path)
+    except Exception:
+        # Caching is best effort (e.g. pyarrow not installed)
+        return
+
+def _evict_cache():
+    """
+    Deletes the least recently used files beyond CACHE_MAX_FILES.
+    Called once per fetch rather than per written file; below the limit it
+    only lists the directory.
+    """
+    with _EVICT_LOCK:
+        try:
+            files = [e.path for e in os.scandir(CACHE_DIR) if e.name.endswith(".parquet")]
+        except FileNotFoundError:
+            return
+        if len(files) <= CACHE_MAX_FILES:
+            return
+            
+        # Other processes (e.g. a scan running next to the app) may delete
+        # files while we look at them, so a vanished file is simply skipped
+        entries = []
+        for path in files:
+            try:
+                entries.append((os.stat(path).st_mtime, path))
+            except FileNotFoundError:
+                continue
+        entries.sort()
+        for _, old in entries[:-CACHE_MAX_FILES]:
+            Path(old).unlink(missing_ok=True)
+
+def _disk_cached(func):
+    """Memoizes a (symbol, period, interval) fetch in CACHE_DIR for the day when use_disk_cache is set."""
+    @functools.wraps(func)
+    def wrapper(symbol: str, period: str = "1y", interval: str = "1d", use_disk_cache: bool = False) -> pd.DataFrame:
+        if not use_disk_cache or interval not in CACHED_INTERVALS:
+            return func(symbol, period, interval)
+            
+        path = _cache_path(symbol, period, interval)
+        df = _read_cache(path)
+        if df is None:
+            df = func(symbol, period, interval)
+            _write_cache(path, df)
+            _evict_cache()
+        return df
+    return wrapper
+
+def _normalize_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Renames yfinance columns to the lowercase names used by the strategy
+    and drops incomplete rows.
+    """
+    # Ensure standard column names
+    df = df.rename(columns={
+        "Open": "open",
+        "High": "high",
+        "Low": "low",
+        "Close": "close",
+        "Volume": "volume"
+    })
+    
+    # Drop any rows with missing values
+    df = df.dropna()
+    
+    return df
+
+@_disk_cached
 def fetch_data(symbol: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
     """
     Fetches OHLCV data from Yahoo Finance.
@@ -9,12 +155,13 @@ def fetch_data(symbol: str, period: str = "1y", interval: str = "1d") -> pd.Data
         symbol: Ticker symbol (e.g., 'SPY', 'BTC-USD')
         period: Data period to download (default '1y')
         interval: Data interval (default '1d')
+        use_disk_cache: Reuse today's download from CACHE_DIR (default False; handled by _disk_cached)
         
     Returns:
         pd.DataFrame: DataFrame with columns Open, High, Low, Close, Volume
     """
     print(f"Fetching data for {symbol}...")
-    df = yf.download(symbol, period=period, interval=interval, progress=False)
+    df = _download(symbol, period=period, interval=interval)
     
     if df.empty:
         raise ValueError(f"No data found for symbol {symbol}")
@@ -23,16 +170,67 @@ def fetch_data(symbol: str, period: str = "1y", interval: str = "1d") -> pd.Data
     if isinstance(df.columns, pd.MultiIndex):
         df.columns = df.columns.get_level_values(0)
         
-    # Ensure standard column names
-    df = df.rename(columns={
-        "Open": "open",
-        "High": "high",
-        "Low": "low",
-        "Close": "close",
-        "Volume": "volume"
-    })
+    return _normalize_ohlcv(df)
+
+def fetch_data_batch(symbols: list[str], period: str = "1y", interval: str = "1d", use_disk_cache: bool = False) -> dict[str, pd.DataFrame]:
+    """
+    Fetches OHLCV data for several symbols with a single Yahoo Finance request.
     
-    # Drop any rows with missing values
-    df = df.dropna()
+    Args:
+        symbols: Ticker symbols to download together
+        period: Data period to download (default '1y')
+        interval: Data interval (default '1d')
+        use_disk_cache: Reuse today's downloads from CACHE_DIR (default False)
+        
+    Returns:
+        dict: Symbol -> DataFrame in the same format as fetch_data.
+              Symbols without data are left out.
+    """
+    data = {}
+    use_cache = use_disk_cache and interval in CACHED_INTERVALS
+    if use_cache:
+        for symbol in symbols:
+            df = _read_cache(_cache_path(symbol, period, interval))
+            if df is not None:
+                data[symbol] = df
+                
+    missing = [s for s in symbols if s not in data]
+    if not missing:
+        return data
+        
+    print(f"Fetching data for {len(missing)} symbols...")
     
-    return df
+    # A transient failure can hit single tickers inside an otherwise good
+    # batch, so symbols that come back missing or empty are re-requested
+    # together, with the same backoff as whole-batch retries
+    pending = missing
+    for attempt in range(DOWNLOAD_ATTEMPTS):
+        if attempt > 0:
+            _backoff(attempt - 1)
+        raw = _download(" ".join(pending), attempts=1, period=period, interval=interval,
+                        group_by='ticker', threads=True)
+        
+        failed = []
+        for symbol in pending:
+            if raw.empty or symbol not in raw.columns.get_level_values(0):
+                failed.append(symbol)
+                continue
+                
+            df = _normalize_ohlcv(raw[symbol])
+            if df.empty:
+                failed.append(symbol)
+                continue
+                
+            data[symbol] = df
+            if use_cache:
+                _write_cache(_cache_path(symbol, period, interval), df)
+                
+        pending = failed
+        if not pending:
+            break
+            
+    if use_cache:
+        _evict_cache()
+            
+    # Keep the caller's symbol order
+    return {s: data[s] for s in symbols if s in data}
@@ -1,39 +1,88 @@
 import numpy as np
 import pandas as pd
+from _njit import njit
 
 def calculate_atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
     """
     Calculates Average True Range (ATR).
     """
-    high = df['high']
-    low = df['low']
-    close = df['close'].shift(1)
-    
-    tr1 = high - low
-    tr2 = (high - close).abs()
-    tr3 = (low - close).abs()
-    
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-    atr = tr.rolling(window=period).mean()
+    high = df['high'].to_numpy(copy=False)
+    low = df['low'].to_numpy(copy=False)
+    close = df['close'].to_numpy(copy=False)
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    
+    # True range in one pass over the raw arrays. fmax skips the NaN
+    # previous close on the first bar, like DataFrame.max does.
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    
+    # Simple moving average from a running sum: each window is the
+    # difference of two cumulative sums, so the cost is O(N) overall.
+    atr_vals = np.full(len(tr), np.nan)
+    if len(tr) >= period:
+        csum = np.concatenate(([0.0], np.cumsum(tr)))
+        atr_vals[period - 1:] = (csum[period:] - csum[:-period]) / period
+    atr = pd.Series(atr_vals, index=df.index)
     
     return atr
 
-def zigzag_pivots(df: pd.DataFrame, deviation_pct: float, min_bars: int = 0) -> tuple[pd.Series, pd.Series]:
+@njit(cache=True, nogil=True)
+def _recent_atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14, tail: int = 30) -> float:
     """
-    Identifies ZigZag pivots based on a percentage deviation.
+    Mean of the last `tail` ATR values, the same as
+    calculate_atr(df).iloc[-tail:].mean(), but only the true ranges of the
+    last period + tail - 1 bars are computed.
     
-    Args:
-        df: DataFrame with 'high' and 'low' columns.
-        deviation_pct: Minimum percentage change to qualify as a new pivot.
-        min_bars: Minimum number of bars between pivots to be considered valid.
+    Returns:
+        float: Average ATR, NaN if there are fewer than `period` bars
+    """
+    n = len(close)
+    
+    # First bar with a full ATR window among the last `tail` bars
+    start = max(n - tail, period - 1)
+    if start >= n:
+        return np.nan
         
+    first = start - period + 1
+    m = n - first
+    tr = np.empty(m)
+    for k in range(m):
+        i = first + k
+        tr[k] = high[i] - low[i]
+        if i > 0:
+            prev_close = close[i - 1]
+            tr[k] = max(tr[k], abs(high[i] - prev_close), abs(low[i] - prev_close))
+            
+    # Slide the window sum across the tail
+    window = tr[:period].sum()
+    total = window
+    for k in range(period, m):
+        window += tr[k] - tr[k - period]
+        total += window
+        
+    return total / period / (m - period + 1)
+
+@njit(cache=True, nogil=True)
+def _zigzag_loop(highs: np.ndarray, lows: np.ndarray, deviation_pct: float, min_bars: int):
+    """
+    ZigZag trend state machine over raw high/low arrays.
+    
     Returns:
-        tuple: (pivot_values, pivot_types)
+        tuple: (pivot_idx, pivot_type, pivot_value) arrays in bar order
     """
-    highs = df['high'].values
-    lows = df['low'].values
+    n = len(highs)
+    
+    # At most one pivot per bar
+    pivot_idx = np.empty(n, np.int64)
+    pivot_type = np.empty(n, np.int8)
+    pivot_value = np.empty(n, np.float64)
+    count = 0
     
-    n = len(df)
+    if n == 0:
+        return pivot_idx, pivot_type, pivot_value
+    
+    # Reversal thresholds are loop invariant
+    up_mult = 1.0 + deviation_pct
+    down_mult = 1.0 - deviation_pct
     
     # Current trend state
     trend = 0 # 1: up, -1: down
@@ -42,23 +91,27 @@ def zigzag_pivots(df: pd.DataFrame, deviation_pct: float, min_bars: int = 0) ->
     last_high = highs[0]
     last_low = lows[0]
     
-    pivots = [] # List of (index, type, value)
-    
     for i in range(1, n):
         curr_high = highs[i]
         curr_low = lows[i]
         
         if trend == 0:
-            if curr_high > last_low * (1 + deviation_pct):
+            if curr_high > last_low * up_mult:
                 trend = 1 # Up trend confirmed
                 # We found a bottom at last_low_idx
-                pivots.append((last_low_idx, -1, last_low))
+                pivot_idx[count] = last_low_idx
+                pivot_type[count] = -1
+                pivot_value[count] = last_low
+                count += 1
                 last_high_idx = i
                 last_high = curr_high
-            elif curr_low < last_high * (1 - deviation_pct):
+            elif curr_low < last_high * down_mult:
                 trend = -1 # Down trend confirmed
                 # We found a top at last_high_idx
-                pivots.append((last_high_idx, 1, last_high))
+                pivot_idx[count] = last_high_idx
+                pivot_type[count] = 1
+                pivot_value[count] = last_high
+                count += 1
                 last_low_idx = i
                 last_low = curr_low
             else:
@@ -74,12 +127,15 @@ def zigzag_pivots(df: pd.DataFrame, deviation_pct: float, min_bars: int = 0) ->
             if curr_high > last_high:
                 last_high = curr_high
                 last_high_idx = i
-            elif curr_low < last_high * (1 - deviation_pct):
+            elif curr_low < last_high * down_mult:
                 # Reversal to downtrend
                 # Check min bars constraint
                 if (i - last_high_idx) >= min_bars or min_bars == 0:
                     trend = -1
-                    pivots.append((last_high_idx, 1, last_high))
+                    pivot_idx[count] = last_high_idx
+                    pivot_type[count] = 1
+                    pivot_value[count] = last_high
+                    count += 1
                     last_low = curr_low
                     last_low_idx = i
                 
@@ -87,28 +143,57 @@ def zigzag_pivots(df: pd.DataFrame, deviation_pct: float, min_bars: int = 0) ->
             if curr_low < last_low:
                 last_low = curr_low
                 last_low_idx = i
-            elif curr_high > last_low * (1 + deviation_pct):
+            elif curr_high > last_low * up_mult:
                 # Reversal to uptrend
                 # Check min bars constraint
                 if (i - last_low_idx) >= min_bars or min_bars == 0:
                     trend = 1
-                    pivots.append((last_low_idx, -1, last_low))
+                    pivot_idx[count] = last_low_idx
+                    pivot_type[count] = -1
+                    pivot_value[count] = last_low
+                    count += 1
                     last_high = curr_high
                     last_high_idx = i
 
     # Add the final pending pivot
     if trend == 1:
-        pivots.append((last_high_idx, 1, last_high))
+        pivot_idx[count] = last_high_idx
+        pivot_type[count] = 1
+        pivot_value[count] = last_high
+        count += 1
     elif trend == -1:
-        pivots.append((last_low_idx, -1, last_low))
+        pivot_idx[count] = last_low_idx
+        pivot_type[count] = -1
+        pivot_value[count] = last_low
+        count += 1
+        
+    return pivot_idx[:count], pivot_type[:count], pivot_value[:count]
+
+def zigzag_pivots(df: pd.DataFrame, deviation_pct: float, min_bars: int = 0) -> tuple[pd.Series, pd.Series]:
+    """
+    Identifies ZigZag pivots based on a percentage deviation.
+    
+    Args:
+        df: DataFrame with 'high' and 'low' columns.
+        deviation_pct: Minimum percentage change to qualify as a new pivot.
+        min_bars: Minimum number of bars between pivots to be considered valid.
         
-    # Convert to Series
-    pivot_series = pd.Series(np.nan, index=df.index)
-    type_series = pd.Series(0, index=df.index)
+    Returns:
+        tuple: (pivot_values, pivot_types)
+    """
+    highs = df['high'].to_numpy(copy=False)
+    lows = df['low'].to_numpy(copy=False)
     
-    for idx, p_type, val in pivots:
-        pivot_series.iloc[idx] = val
-        type_series.iloc[idx] = p_type
+    pivot_idx, pivot_type, pivot_value = _zigzag_loop(highs, lows, deviation_pct, min_bars)
+        
+    # Convert to Series with one scatter per array
+    values = np.full(len(df), np.nan)
+    types = np.zeros(len(df), dtype=np.int8) # Only 1, -1 or 0
+    np.put(values, pivot_idx, pivot_value)
+    np.put(types, pivot_idx, pivot_type)
+    
+    pivot_series = pd.Series(values, index=df.index)
+    type_series = pd.Series(types, index=df.index)
         
     return pivot_series, type_series
 
@@ -117,9 +202,10 @@ def dynamic_zigzag(df: pd.DataFrame, atr_multiplier: float = 3.0, min_deviation:
     Calculates ZigZag pivots with dynamic sensitivity based on ATR.
     """
     # Calculate recent volatility (e.g., last 30 days average ATR)
-    atr = calculate_atr(df)
+    avg_atr = _recent_atr(df['high'].to_numpy(copy=False),
+                          df['low'].to_numpy(copy=False),
+                          df['close'].to_numpy(copy=False))
     current_price = df['close'].iloc[-1]
-    avg_atr = atr.iloc[-30:].mean()
     
     if pd.isna(avg_atr) or current_price == 0:
         deviation = 0.05 
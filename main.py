@@ -1,5 +1,9 @@
 import argparse
+import matplotlib
+matplotlib.use('Agg') # Charts are only saved to files; skip GUI backend setup
 import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+from matplotlib.collections import LineCollection
 import pandas as pd
 from data_loader import fetch_data
 from strategy import MeasuredMoveStrategy
@@ -9,24 +13,35 @@ def plot_results(df, pivots, moves, symbol):
     plt.plot(df.index, df['close'], label='Close Price', color='black', alpha=0.6, linewidth=1)
     
     # Plot Pivots
-    pivot_dates = pivots.dropna().index
-    pivot_values = pivots.dropna().values
+    pivot_points = pivots.dropna()
+    pivot_dates = pivot_points.index
+    pivot_values = pivot_points.values
     plt.plot(pivot_dates, pivot_values, color='blue', linestyle='--', linewidth=1, label='ZigZag Pivots')
     plt.scatter(pivot_dates, pivot_values, color='red', s=20, zorder=5)
     
     # Plot Measured Moves
-    for move in moves:
-        color = 'green' if move.direction == "Bullish" else 'red'
-        
-        # Draw the A-B-C lines
-        plt.plot([move.start_idx, move.mid_idx, move.end_idx], 
-                 [move.start_price, move.mid_price, move.end_price], 
-                 color=color, linewidth=2)
+    # All A-B-C paths go into one LineCollection and all targets into one
+    # hlines call instead of one artist per move
+    ax = plt.gca()
+    colors = ['green' if move.direction == "Bullish" else 'red' for move in moves]
+    
+    if moves:
+        segments = [
+            [(mdates.date2num(move.start_idx), move.start_price),
+             (mdates.date2num(move.mid_idx), move.mid_price),
+             (mdates.date2num(move.end_idx), move.end_price)]
+            for move in moves
+        ]
+        ax.add_collection(LineCollection(segments, colors=colors, linewidths=2))
+        ax.autoscale_view()
         
         # Draw Projection (C to Target)
         # We don't have a time for Target, so we just draw a horizontal line or a projected vector
         # Let's draw a horizontal line at the target level
-        plt.axhline(y=move.projected_target, color=color, linestyle=':', alpha=0.8)
+        ax.hlines([move.projected_target for move in moves], df.index[0], df.index[-1],
+                  colors=colors, linestyles=':', alpha=0.8)
+        
+    for move, color in zip(moves, colors):
         plt.text(df.index[-1], move.projected_target, f"Target: {move.projected_target:.2f}", 
                  color=color, verticalalignment='center')
         
@@ -1,15 +1,13 @@
-import yfinance as yf
-
 # --- Asset Lists ---
 
 # US Indices
-DOW_30 = [
+DOW_30 = (
     "MMM", "AXP", "AMGN", "AAPL", "BA", "CAT", "CVX", "CSCO", "KO", "DIS", 
     "DOW", "GS", "HD", "HON", "IBM", "INTC", "JNJ", "JPM", "MCD", "MRK", 
     "MSFT", "NKE", "NVDA", "PG", "CRM", "TRV", "UNH", "VZ", "V", "WMT"
-]
+)
 
-NASDAQ_100 = [
+NASDAQ_100 = (
     "AAPL", "ABNB", "ADBE", "ADI", "ADP", "ADSK", "AEP", "AMAT", "AMD", "AMGN", 
     "AMZN", "ANSS", "ASML", "AVGO", "AZN", "BIIB", "BKNG", "BKR", "CDNS", "CEG", 
     "CHTR", "CMCSA", "COST", "CPRT", "CSCO", "CSX", "CTAS", "CTSH", "DDOG", "DLTR", 
@@ -20,10 +18,10 @@ NASDAQ_100 = [
     "PCAR", "PDD", "PEP", "PYPL", "QCOM", "REGN", "ROST", "SBUX", "SGEN", "SIRI", 
     "SNPS", "SPLK", "SWKS", "TEAM", "TMUS", "TSLA", "TXN", "VRSK", "VRTX", "WBA", 
     "WBD", "WDAY", "XEL", "ZM", "ZS"
-]
+)
 
 # Global Indices (Major)
-GLOBAL_INDICES = [
+GLOBAL_INDICES = (
     "^GSPC",  # S&P 500 (US)
     "^DJI",   # Dow Jones (US)
     "^IXIC",  # Nasdaq (US)
@@ -39,17 +37,17 @@ GLOBAL_INDICES = [
     "^BSESN", # BSE SENSEX (India)
     "^BVSP",  # IBOVESPA (Brazil)
     "^MXX",   # IPC (Mexico)
-]
+)
 
 # Crypto (Major)
-CRYPTO = [
+CRYPTO = (
     "BTC-USD", "ETH-USD", "SOL-USD", "XRP-USD", "BNB-USD", 
     "ADA-USD", "DOGE-USD", "TRX-USD", "LINK-USD", "LTC-USD",
     "BCH-USD", "DOT-USD", "MATIC-USD", "SHIB-USD", "AVAX-USD"
-]
+)
 
 # Commodities
-COMMODITIES_HARD = [
+COMMODITIES_HARD = (
     "GC=F", # Gold
     "SI=F", # Silver
     "HG=F", # Copper
@@ -59,9 +57,9 @@ COMMODITIES_HARD = [
     "BZ=F", # Brent Crude
     "NG=F", # Natural Gas
     "RB=F", # RBOB Gasoline
-]
+)
 
-COMMODITIES_SOFT = [
+COMMODITIES_SOFT = (
     "ZC=F", # Corn
     "ZW=F", # Wheat
     "ZS=F", # Soybean
@@ -71,25 +69,24 @@ COMMODITIES_SOFT = [
     "CT=F", # Cotton
     "OJ=F", # Orange Juice
     "LBS=F" # Lumber
-]
+)
+
+# Universe for the daily scan: Dow 30 plus Nasdaq 100, de-duplicated once
+# at import while keeping list order
+SCAN_UNIVERSE = tuple(dict.fromkeys(DOW_30 + NASDAQ_100))
+
+_CATEGORY_MAP = {
+    "Dow 30": DOW_30,
+    "Nasdaq 100": NASDAQ_100,
+    "Global Indices": GLOBAL_INDICES,
+    "Crypto": CRYPTO,
+    "Commodities (Hard)": COMMODITIES_HARD,
+    "Commodities (Soft)": COMMODITIES_SOFT,
+}
 
-def get_index_constituents(category: str) -> list[str]:
-    """Returns a list of symbols for the given category."""
-    if category == "Dow 30":
-        return DOW_30
-    elif category == "Nasdaq 100":
-        return NASDAQ_100
-    elif category == "Global Indices":
-        return GLOBAL_INDICES
-    elif category == "Crypto":
-        return CRYPTO
-    elif category == "Commodities (Hard)":
-        return COMMODITIES_HARD
-    elif category == "Commodities (Soft)":
-        return COMMODITIES_SOFT
-    elif category == "Custom":
-        return []
-    return []
+def get_index_constituents(category: str) -> tuple[str, ...]:
+    """Returns the symbols for the given category ("Custom" and unknown categories are empty)."""
+    return _CATEGORY_MAP.get(category, ())
 
 def get_timeframe_params(tf: str) -> tuple[str, str]:
     """
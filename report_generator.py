@@ -4,15 +4,34 @@ from visualization import plot_interactive_chart
 import os
 from datetime import datetime
 
+# Each embedded chart grows linearly with its bar count, so report charts
+# only show recent history (extended back to the start of the patterns)
+REPORT_CHART_BARS = 500
+
+def _chart_window(df: pd.DataFrame, pivots: pd.Series, moves: list):
+    """
+    Returns the trailing slice of df and pivots to plot for the given moves.
+    """
+    start = max(0, len(df) - REPORT_CHART_BARS)
+    if moves:
+        first_move = min(move.start_idx for move in moves)
+        start = min(start, df.index.searchsorted(first_move))
+        
+    window = df.iloc[start:]
+    return window, pivots.loc[window.index[0]:]
+
 def generate_html_report(results: list, filename: str = None):
     """
     Generates a self-contained HTML report with summary table and interactive charts.
     """
+    date_str = datetime.now().strftime("%Y-%m-%d")
     if not filename:
-        date_str = datetime.now().strftime("%Y-%m-%d")
         filename = f"daily_report_{date_str}.html"
         
-    html_content = f"""
+    # Collect fragments and join once; repeated += on a string that holds
+    # many embedded charts is quadratic
+    parts: list[str] = []
+    parts.append(f"""
     <html>
     <head>
         <title>Measured Move Daily Report</title>
@@ -28,23 +47,23 @@ def generate_html_report(results: list, filename: str = None):
         </style>
     </head>
     <body>
-        <h1>Daily Measured Move Report - {datetime.now().strftime("%Y-%m-%d")}</h1>
+        <h1>Daily Measured Move Report - {date_str}</h1>
         
         <h2>Summary of Opportunities</h2>
-    """
+    """)
     
     if not results:
-        html_content += "<p>No opportunities found matching criteria today.</p></body></html>"
+        parts.append("<p>No opportunities found matching criteria today.</p></body></html>")
         with open(filename, "w") as f:
-            f.write(html_content)
+            f.write("".join(parts))
         return filename
 
     # Create Summary Table
-    html_content += "<table class='summary-table'><thead><tr><th>Symbol</th><th>Direction</th><th>Price</th><th>Target (D)</th><th>Dist to Target %</th></tr></thead><tbody>"
+    parts.append("<table class='summary-table'><thead><tr><th>Symbol</th><th>Direction</th><th>Price</th><th>Target (D)</th><th>Dist to Target %</th></tr></thead><tbody>")
     
     for res in results:
         direction_class = "bullish" if res['Direction'] == "Bullish" else "bearish"
-        html_content += f"""
+        parts.append(f"""
         <tr>
             <td>{res['Symbol']}</td>
             <td class='{direction_class}'>{res['Direction']}</td>
@@ -52,27 +71,28 @@ def generate_html_report(results: list, filename: str = None):
             <td>{res['Target (D)']:.2f}</td>
             <td>{res['Dist to Target %']:.2f}%</td>
         </tr>
-        """
-    html_content += "</tbody></table>"
+        """)
+    parts.append("</tbody></table>")
     
     # Create Charts
-    html_content += "<h2>Detailed Charts</h2>"
+    parts.append("<h2>Detailed Charts</h2>")
     
     for res in results:
-        fig = plot_interactive_chart(res['DataFrame'], res['Pivots'], res['Moves'], res['Symbol'])
+        df, pivots = _chart_window(res['DataFrame'], res['Pivots'], res['Moves'])
+        fig = plot_interactive_chart(df, pivots, res['Moves'], res['Symbol'])
         # Convert Plotly fig to HTML div
         plot_html = pio.to_html(fig, full_html=False, include_plotlyjs='cdn')
         
-        html_content += f"""
+        parts.append(f"""
         <div class="chart-container">
             <h3>{res['Symbol']} - {res['Direction']} (Target: {res['Target (D)']:.2f})</h3>
             {plot_html}
         </div>
-        """
+        """)
         
-    html_content += "</body></html>"
+    parts.append("</body></html>")
     
     with open(filename, "w") as f:
-        f.write(html_content)
+        f.write("".join(parts))
         
     return filename
@@ -1,10 +1,18 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, fields
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, List, Optional
 from indicators import dynamic_zigzag, calculate_rsi
+from _njit import njit
 
-@dataclass
+# Slotted dataclasses (no per-instance __dict__) need Python 3.10+
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_SLOTS)
 class MeasuredMove:
     start_idx: pd.Timestamp
     mid_idx: pd.Timestamp
@@ -23,209 +31,348 @@ class MeasuredMove:
     proximity_to_d_pct: float = 0.0 # How close is current price to point D (Target)?
     retracement_pct: float = 0.0 # Retracement ratio (B-C)/(B-A)
 
+# MovesTable encodes direction as a small int
+_DIRECTION_CODES = {"Bullish": 1, "Bearish": -1}
+_DIRECTION_NAMES = {1: "Bullish", -1: "Bearish"}
+
+@dataclass
+class MovesTable:
+    """
+    Column-oriented (structure of arrays) view of a list of MeasuredMove
+    objects, so filters can run as vector operations, e.g.
+    table.slice(table.proximity_to_d_pct * 100 <= threshold).
+    Indexing or iterating yields MeasuredMove objects again.
+    """
+    start_idx: pd.DatetimeIndex
+    mid_idx: pd.DatetimeIndex
+    end_idx: pd.DatetimeIndex
+    
+    start_price: np.ndarray
+    mid_price: np.ndarray
+    end_price: np.ndarray
+    
+    projected_target: np.ndarray
+    direction: np.ndarray # int8: 1 Bullish, -1 Bearish
+    
+    completion_pct: np.ndarray
+    current_price_at_analysis: np.ndarray
+    proximity_to_c_pct: np.ndarray
+    proximity_to_d_pct: np.ndarray
+    retracement_pct: np.ndarray
+    
+    @classmethod
+    def from_moves(cls, moves: List[MeasuredMove]) -> "MovesTable":
+        def floats(name):
+            return np.array([getattr(m, name) for m in moves], dtype=np.float64)
+            
+        return cls(
+            start_idx=pd.DatetimeIndex([m.start_idx for m in moves]),
+            mid_idx=pd.DatetimeIndex([m.mid_idx for m in moves]),
+            end_idx=pd.DatetimeIndex([m.end_idx for m in moves]),
+            start_price=floats('start_price'),
+            mid_price=floats('mid_price'),
+            end_price=floats('end_price'),
+            projected_target=floats('projected_target'),
+            direction=np.array([_DIRECTION_CODES[m.direction] for m in moves], dtype=np.int8),
+            completion_pct=floats('completion_pct'),
+            current_price_at_analysis=floats('current_price_at_analysis'),
+            proximity_to_c_pct=floats('proximity_to_c_pct'),
+            proximity_to_d_pct=floats('proximity_to_d_pct'),
+            retracement_pct=floats('retracement_pct')
+        )
+        
+    def __len__(self) -> int:
+        return len(self.projected_target)
+        
+    def __getitem__(self, i: int) -> MeasuredMove:
+        return MeasuredMove(
+            start_idx=self.start_idx[i],
+            mid_idx=self.mid_idx[i],
+            end_idx=self.end_idx[i],
+            start_price=float(self.start_price[i]),
+            mid_price=float(self.mid_price[i]),
+            end_price=float(self.end_price[i]),
+            projected_target=float(self.projected_target[i]),
+            direction=_DIRECTION_NAMES[int(self.direction[i])],
+            completion_pct=float(self.completion_pct[i]),
+            current_price_at_analysis=float(self.current_price_at_analysis[i]),
+            proximity_to_c_pct=float(self.proximity_to_c_pct[i]),
+            proximity_to_d_pct=float(self.proximity_to_d_pct[i]),
+            retracement_pct=float(self.retracement_pct[i])
+        )
+        
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+            
+    def slice(self, mask: np.ndarray) -> "MovesTable":
+        """Returns the rows selected by a boolean mask (or index array)."""
+        return MovesTable(**{f.name: getattr(self, f.name)[mask] for f in fields(self)})
+
+@njit(cache=True, nogil=True)
+def _filter_candidates(direction: np.ndarray, prices: np.ndarray,
+                       positions: np.ndarray, vol_cs: np.ndarray, ema_at_pivots: np.ndarray, rsi_at_pivots: np.ndarray,
+                       use_ema_filter: bool, use_volume_filter: bool, use_time_filter: bool, use_rsi_filter: bool) -> np.ndarray:
+    """
+    Applies the optional filters to the candidate triplets.
+    The pivot arrays cover the recent pivot window; candidate k has A, B
+    and C at window positions k, k + 1 and k + 2, and direction[k] is
+    1 (Bullish), -1 (Bearish) or 0 (no pattern, or one that failed the
+    vectorized Fibonacci check). Arrays for disabled filters may be empty.
+    
+    Returns:
+        np.ndarray: Boolean mask of the patterns that pass every enabled filter
+    """
+    keep = np.zeros(len(direction), np.bool_)
+    for k in range(len(direction)):
+        d = direction[k]
+        if d == 0:
+            continue
+        a = k
+        b = a + 1
+        c = a + 2
+        
+        # Trend Filter Check: Point C (Entry area) must be above EMA 200
+        # for bullish moves and below it for bearish ones
+        if use_ema_filter:
+            if d == 1 and prices[c] < ema_at_pivots[c]:
+                continue # Skip if below EMA (Counter-trend)
+            if d == -1 and prices[c] > ema_at_pivots[c]:
+                continue # Skip if above EMA (Counter-trend)
+                
+        # Volume Confirmation: mean volume over each leg, end bars included
+        if use_volume_filter:
+            impulse_vol = (vol_cs[positions[b] + 1] - vol_cs[positions[a]]) / (positions[b] - positions[a] + 1)
+            retracement_vol = (vol_cs[positions[c] + 1] - vol_cs[positions[b]]) / (positions[c] - positions[b] + 1)
+            if retracement_vol >= impulse_vol:
+                continue
+                
+        # Time Symmetry
+        if use_time_filter:
+            impulse_len = positions[b] - positions[a] + 1
+            retracement_len = positions[c] - positions[b] + 1
+            if retracement_len > (impulse_len * 2.0):
+                continue
+                
+        # RSI Filter: skip overbought bullish and oversold bearish setups
+        if use_rsi_filter:
+            if d == 1 and rsi_at_pivots[c] > 70:
+                continue
+            if d == -1 and rsi_at_pivots[c] < 30:
+                continue
+                
+        keep[k] = True
+        
+    return keep
+
 class MeasuredMoveStrategy:
+    CACHE_MAX_ENTRIES = 32
+    ACTIVE_MOVES = 5 # Only the most recent patterns are kept
+    
     def __init__(self, symbol: str, df: pd.DataFrame):
         self.symbol = symbol
         self.df = df
         self.pivots = None
         self.pivot_types = None
-        self.moves: List[MeasuredMove] = []
+        self.pivot_positions = None # Bar positions of the pivots in self.df
+        self.moves: Deque[MeasuredMove] = deque(maxlen=self.ACTIVE_MOVES)
+        self._cache = {}
         
-    def analyze(self, atr_multiplier: float = 3.0, min_bars: int = 10, strict_fib: bool = False, use_ema_filter: bool = False, use_volume_filter: bool = False, use_time_filter: bool = False, use_rsi_filter: bool = False):
+    @property
+    def df(self) -> pd.DataFrame:
+        return self._df
+        
+    @df.setter
+    def df(self, df: pd.DataFrame):
+        # Raw close prices for the hot path, refreshed whenever the frame is replaced
+        self._df = df
+        self._close = df['close'].to_numpy(dtype=np.float64)
+        
+    def _cached(self, key, compute):
         """
-        Runs the analysis to find pivots and project measured moves.
+        Returns compute(self.df), computed once per frame and reused by later
+        analyze calls (e.g. a sweep over filter flags). Recomputed if self.df
+        is replaced; the oldest entries are dropped beyond CACHE_MAX_ENTRIES.
+        """
+        cached = self._cache.get(key)
+        if cached is None or cached[0] is not self.df:
+            cached = (self.df, compute(self.df))
+            self._cache[key] = cached
+            while len(self._cache) > self.CACHE_MAX_ENTRIES:
+                del self._cache[next(iter(self._cache))]
+        return cached[1]
+        
+    @staticmethod
+    def _find_pivots(df: pd.DataFrame, atr_multiplier: float, min_bars: int) -> tuple:
+        """
+        Runs the ZigZag and also returns the pivot points as parallel arrays
+        (structure of arrays), aligned by position.
+        
+        Returns:
+            tuple: (pivots, pivot_types, positions, dates, prices, types)
+        """
+        pivots, pivot_types = dynamic_zigzag(df, atr_multiplier=atr_multiplier, min_bars=min_bars)
+        
+        # The pivot Series share df's index, so the bar positions are just the
+        # non-NaN slots and everything else is gathered from them; no dropna
+        positions = np.flatnonzero(pivots.notna().to_numpy())
+        dates = df.index[positions]
+        prices = pivots.to_numpy()[positions]
+        types = pivot_types.to_numpy(dtype=np.int8)[positions] # 1 for High, -1 for Low
+        
+        return pivots, pivot_types, positions, dates, prices, types
+        
+    def _apply_filters(self, direction: np.ndarray, prices: np.ndarray, start_index: int, use_ema_filter: bool, use_volume_filter: bool, use_time_filter: bool, use_rsi_filter: bool) -> np.ndarray:
+        """
+        Gathers the inputs for the enabled bar-level filters and runs
+        _filter_candidates over the pivot window starting at start_index.
+        
+        Returns:
+            np.ndarray: Boolean mask over the candidate triplets
         """
-        # Calculate EMA 200 if needed
-        ema_200 = None
+        # Inputs for the optional filters cover only the recent pivot window
+        # (disabled filters get an empty array). With the bar positions of the
+        # window pivots, indicator values, leg lengths and volume means are
+        # plain array lookups.
+        no_data = np.empty(0)
+        pos = self.pivot_positions[start_index:]
+            
+        # EMA and RSI are recursive, so they still run over the full history
+        # (a truncated warmup would shift their values), but only once per frame
         if use_ema_filter:
-            ema_200 = self.df['close'].ewm(span=200, adjust=False).mean()
-
-        # Calculate RSI if needed
-        rsi_series = None
+            ema_at_pivots = self._cached('ema_200', lambda df: df['close'].ewm(span=200, adjust=False).mean().to_numpy())[pos]
+        else:
+            ema_at_pivots = no_data
         if use_rsi_filter:
-            rsi_series = calculate_rsi(self.df)
-
+            rsi_at_pivots = self._cached('rsi', lambda df: calculate_rsi(df).to_numpy())[pos]
+        else:
+            rsi_at_pivots = no_data
+            
+        # vol_cs[j] is the total volume of the first j bars. Volume is only
+        # read here, so frames without a volume column work with the filter off.
+        if use_volume_filter:
+            vol_cs = self._cached('volume_cumsum', lambda df: np.concatenate(([0.0], np.cumsum(df['volume'].to_numpy(dtype=np.float64)))))
+        else:
+            vol_cs = no_data
+            
+        return _filter_candidates(direction, prices[start_index:],
+                                  pos, vol_cs, ema_at_pivots, rsi_at_pivots,
+                                  use_ema_filter, use_volume_filter, use_time_filter, use_rsi_filter)
+        
+    def analyze(self, atr_multiplier: float = 3.0, min_bars: int = 10, strict_fib: bool = False, use_ema_filter: bool = False, use_volume_filter: bool = False, use_time_filter: bool = False, use_rsi_filter: bool = False):
+        """
+        Runs the analysis to find pivots and project measured moves.
+        """
         # 1. Identify Pivots
-        self.pivots, self.pivot_types = dynamic_zigzag(self.df, atr_multiplier=atr_multiplier, min_bars=min_bars)
+        # They do not depend on the filter flags, so calls that only change filters reuse them
+        self.pivots, self.pivot_types, self.pivot_positions, dates, prices, types = self._cached(
+            ('zigzag', atr_multiplier, min_bars),
+            lambda df: self._find_pivots(df, atr_multiplier, min_bars)
+        )
         
         # 2. Identify Patterns (A-B-C)
         # We need a sequence of 3 pivots:
         # Bullish: Low (A) -> High (B) -> Higher Low (C)
         # Bearish: High (A) -> Low (B) -> Lower High (C)
-        
-        # Extract pivot points into a list for easier iteration
-        pivot_data = []
-        for date, val in self.pivots.dropna().items():
-            p_type = self.pivot_types.loc[date]
-            pivot_data.append({
-                'date': date,
-                'price': val,
-                'type': p_type # 1 for High, -1 for Low
-            })
+        n_pivots = len(prices)
+        current_price = float(self._close[-1])
             
-        if len(pivot_data) < 3:
+        if n_pivots < 3:
             # print("Not enough pivots to detect patterns.")
             return
             
-        # Iterate through pivots to find potential active measured moves
-        # We look at the last 3 pivots to see if a pattern is forming/active
-        
-        # Look back at recent history
-        # We want to check triplets starting at i. Last triplet starts at N-3.
-        # range(start, stop) -> stop is exclusive. So we want stop at N-2.
-        start_index = max(0, len(pivot_data) - 5) # Look at last few pivots only
-        for i in range(start_index, len(pivot_data) - 2):
-            if i < 0: continue
+        # Find potential active measured moves among the most recent pivots.
+        # Triplets start at the last few pivots; the last one starts at N-3.
+        # A, B and C are aligned slices, so element k is the triplet starting at start_index + k.
+        start_index = max(0, n_pivots - 5) # Look at last few pivots only
+        pA, pB, pC = prices[start_index:-2], prices[start_index + 1:-1], prices[start_index + 2:]
+        tA, tB, tC = types[start_index:-2], types[start_index + 1:-1], types[start_index + 2:]
+        
+        # Direction follows from A: a Low (-1) starts a Bullish move (+1), a High
+        # starts a Bearish one (-1). With this sign both directions share one
+        # set of formulas.
+        sign = -tA
+        
+        # Impulse (A to B) as a positive magnitude, retracement (B to C),
+        # and the target projected from C
+        impulse_move = sign * (pB - pA)
+        retracement = sign * (pB - pC)
+        retracement_pct = np.divide(retracement, impulse_move, out=np.zeros_like(impulse_move), where=impulse_move != 0)
+        target = pC + sign * impulse_move
+        
+        # Bullish Measured Move: Low -> High -> Higher Low (optional but typical for trend)
+        # Bearish Measured Move: High -> Low -> Lower High
+        is_pattern = (tB == -tA) & (tC == tA) & (sign * (pC - pA) > 0)
+        
+        # Smart Validation: Fibonacci Check
+        # Healthy retracement is typically 0.382 to 0.786
+        if strict_fib:
+            is_pattern &= (retracement_pct >= 0.382) & (retracement_pct <= 0.786)
+            
+        direction = np.where(is_pattern, sign, 0).astype(np.int8)
+        
+        if use_ema_filter or use_volume_filter or use_time_filter or use_rsi_filter:
+            keep = self._apply_filters(direction, prices, start_index, use_ema_filter, use_volume_filter, use_time_filter, use_rsi_filter)
+        else:
+            # Fast path (the common interactive case): nothing to check beyond
+            # the pattern itself, so no filter inputs are gathered
+            keep = direction != 0
             
-            pA = pivot_data[i]
-            pB = pivot_data[i+1]
-            pC = pivot_data[i+2]
+        for k in np.flatnonzero(keep):
+            a, b, c = start_index + k, start_index + k + 1, start_index + k + 2
             
-            # Check for Bullish Measured Move (Low -> High -> Higher Low)
-            if pA['type'] == -1 and pB['type'] == 1 and pC['type'] == -1:
-                if pC['price'] > pA['price']: # Higher Low constraint (optional but typical for trend)
-                    
-                    # Trend Filter Check
-                    if use_ema_filter and ema_200 is not None:
-                        # Check if Point C (Entry area) is above EMA 200
-                        # We need to find the EMA value at pC['date']
-                        try:
-                            ema_val = ema_200.loc[pC['date']]
-                            if pC['price'] < ema_val:
-                                continue # Skip if below EMA (Counter-trend)
-                        except KeyError:
-                            pass # Date might be missing if calculated differently, skip check or continue
-
-                    # Calculate Impulse (A to B)
-                    impulse_move = pB['price'] - pA['price']
-                    retracement = pB['price'] - pC['price']
-                    retracement_pct = retracement / impulse_move if impulse_move != 0 else 0
-                    
-                    # Smart Validation: Fibonacci Check
-                    # Healthy retracement is typically 0.382 to 0.786
-                    if strict_fib:
-                        if not (0.382 <= retracement_pct <= 0.786):
-                            continue
-
-                    # Volume Confirmation
-                    if use_volume_filter:
-                        impulse_vol = self.df.loc[pA['date']:pB['date']]['volume'].mean()
-                        retracement_vol = self.df.loc[pB['date']:pC['date']]['volume'].mean()
-                        if retracement_vol >= impulse_vol:
-                            continue
-
-                    # Time Symmetry
-                    if use_time_filter:
-                        impulse_len = len(self.df.loc[pA['date']:pB['date']])
-                        retracement_len = len(self.df.loc[pB['date']:pC['date']])
-                        if retracement_len > (impulse_len * 2.0):
-                            continue
-
-                    # RSI Filter
-                    if use_rsi_filter and rsi_series is not None:
-                        try:
-                            rsi_val = rsi_series.loc[pC['date']]
-                            if rsi_val > 70:
-                                continue
-                        except KeyError:
-                            pass
-
-                    # Project from C
-                    target = pC['price'] + impulse_move
-                    
-                    # Calculate Proximity
-                    current_price = self.df['close'].iloc[-1]
-                    proximity_c = abs(current_price - pC['price']) / pC['price']
-                    proximity_d = abs(current_price - target) / target
-                    
-                    move = MeasuredMove(
-                        start_idx=pA['date'],
-                        mid_idx=pB['date'],
-                        end_idx=pC['date'],
-                        start_price=pA['price'],
-                        mid_price=pB['price'],
-                        end_price=pC['price'],
-                        projected_target=target,
-                        direction="Bullish",
-                        current_price_at_analysis=current_price,
-                        proximity_to_c_pct=proximity_c,
-                        proximity_to_d_pct=proximity_d,
-                        retracement_pct=retracement_pct
-                    )
-                    self.moves.append(move)
-
-            # Check for Bearish Measured Move (High -> Low -> Lower High)
-            elif pA['type'] == 1 and pB['type'] == -1 and pC['type'] == 1:
-                if pC['price'] < pA['price']: # Lower High constraint
-                    
-                    # Trend Filter Check
-                    if use_ema_filter and ema_200 is not None:
-                        # Check if Point C (Entry area) is below EMA 200
-                        try:
-                            ema_val = ema_200.loc[pC['date']]
-                            if pC['price'] > ema_val:
-                                continue # Skip if above EMA (Counter-trend)
-                        except KeyError:
-                            pass
-
-                    # Calculate Impulse (A to B)
-                    impulse_move = pA['price'] - pB['price'] # Positive magnitude
-                    retracement = pC['price'] - pB['price']
-                    retracement_pct = retracement / impulse_move if impulse_move != 0 else 0
-                    
-                    # Smart Validation: Fibonacci Check
-                    if strict_fib:
-                        if not (0.382 <= retracement_pct <= 0.786):
-                            continue
-
-                    # Volume Confirmation
-                    if use_volume_filter:
-                        impulse_vol = self.df.loc[pA['date']:pB['date']]['volume'].mean()
-                        retracement_vol = self.df.loc[pB['date']:pC['date']]['volume'].mean()
-                        if retracement_vol >= impulse_vol:
-                            continue
-
-                    # Time Symmetry
-                    if use_time_filter:
-                        impulse_len = len(self.df.loc[pA['date']:pB['date']])
-                        retracement_len = len(self.df.loc[pB['date']:pC['date']])
-                        if retracement_len > (impulse_len * 2.0):
-                            continue
-
-                    # RSI Filter
-                    if use_rsi_filter and rsi_series is not None:
-                        try:
-                            rsi_val = rsi_series.loc[pC['date']]
-                            if rsi_val < 30:
-                                continue
-                        except KeyError:
-                            pass
-                    
-                    # Project from C
-                    target = pC['price'] - impulse_move
-                    
-                    # Calculate Proximity
-                    current_price = self.df['close'].iloc[-1]
-                    proximity_c = abs(current_price - pC['price']) / pC['price']
-                    proximity_d = abs(current_price - target) / target
-                    
-                    move = MeasuredMove(
-                        start_idx=pA['date'],
-                        mid_idx=pB['date'],
-                        end_idx=pC['date'],
-                        start_price=pA['price'],
-                        mid_price=pB['price'],
-                        end_price=pC['price'],
-                        projected_target=target,
-                        direction="Bearish",
-                        current_price_at_analysis=current_price,
-                        proximity_to_c_pct=proximity_c,
-                        proximity_to_d_pct=proximity_d,
-                        retracement_pct=retracement_pct
-                    )
-                    self.moves.append(move)
+            # Calculate Proximity
+            proximity_c = abs(current_price - prices[c]) / prices[c]
+            proximity_d = abs(current_price - target[k]) / target[k]
+            
+            move = MeasuredMove(
+                start_idx=dates[a],
+                mid_idx=dates[b],
+                end_idx=dates[c],
+                start_price=prices[a],
+                mid_price=prices[b],
+                end_price=prices[c],
+                projected_target=target[k],
+                direction=_DIRECTION_NAMES[direction[k]],
+                current_price_at_analysis=current_price,
+                proximity_to_c_pct=proximity_c,
+                proximity_to_d_pct=proximity_d,
+                retracement_pct=retracement_pct[k]
+            )
+            self.moves.append(move)
     
     def get_active_moves(self) -> List[MeasuredMove]:
         # Filter for moves that haven't been invalidated or fully completed long ago?
         # For now, just return the most recent ones
-        return self.moves[-5:] # Return last 5 detected patterns
+        return list(self.moves) # Last ACTIVE_MOVES detected patterns
+        
+    def get_moves_table(self) -> MovesTable:
+        """Same moves as get_active_moves, as a MovesTable."""
+        return MovesTable.from_moves(self.get_active_moves())
+
+def scan_all(data: dict, max_workers: Optional[int] = None, **analyze_kwargs) -> dict:
+    """
+    Analyzes many symbols on a thread pool. The Numba kernels release the
+    GIL, so the threads overlap in the compiled parts of each analysis.
+    
+    Args:
+        data: Symbol -> OHLCV DataFrame
+        max_workers: Number of threads (default os.cpu_count())
+        **analyze_kwargs: Passed to MeasuredMoveStrategy.analyze for every symbol
+        
+    Returns:
+        dict: Symbol -> analyzed MeasuredMoveStrategy in input order.
+              Symbols whose analysis failed are left out.
+    """
+    def run(item):
+        symbol, df = item
+        try:
+            strategy = MeasuredMoveStrategy(symbol, df)
+            strategy.analyze(**analyze_kwargs)
+            return symbol, strategy
+        except Exception:
+            # A bad symbol should not drop the rest of the scan
+            return symbol, None
+            
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        return {symbol: strategy for symbol, strategy in executor.map(run, data.items()) if strategy is not None}
@@ -1,11 +1,46 @@
 import plotly.graph_objects as go
 import pandas as pd
+import numpy as np
+
+# Candles beyond this are merged before plotting; the browser payload
+# grows linearly with the number of bars
+MAX_CHART_BARS = 2000
+
+# Shared layout, built once so the dark template is resolved at import
+# rather than on every chart
+_BASE_LAYOUT = go.Layout(
+    yaxis_title='Price',
+    xaxis_title='Date',
+    xaxis_rangeslider_visible=False,
+    template="plotly_dark",
+    height=600
+)
+
+def _mm_downsample(df: pd.DataFrame, n_buckets: int) -> pd.DataFrame:
+    """
+    Merges consecutive bars into n_buckets candles, keeping the first open,
+    last close, highest high and lowest low of each bucket.
+    """
+    starts = np.unique(np.linspace(0, len(df), n_buckets, endpoint=False).astype(np.int64))
+    ends = np.append(starts[1:], len(df)) - 1
+    
+    return pd.DataFrame({
+        'open': df['open'].to_numpy()[starts],
+        'high': np.maximum.reduceat(df['high'].to_numpy(), starts),
+        'low': np.minimum.reduceat(df['low'].to_numpy(), starts),
+        'close': df['close'].to_numpy()[ends]
+    }, index=df.index[starts])
 
 def plot_interactive_chart(df: pd.DataFrame, pivots: pd.Series, moves: list, symbol: str):
     """
     Creates an interactive Plotly candlestick chart with pivots and measured moves.
     """
-    fig = go.Figure()
+    fig = go.Figure(layout=_BASE_LAYOUT)
+    
+    # Long intraday histories are downsampled; pivots and moves below
+    # still use their exact prices
+    if len(df) > MAX_CHART_BARS:
+        df = _mm_downsample(df, MAX_CHART_BARS)
 
     # 1. Candlestick Chart
     fig.add_trace(go.Candlestick(
@@ -18,8 +53,9 @@ def plot_interactive_chart(df: pd.DataFrame, pivots: pd.Series, moves: list, sym
     ))
 
     # 2. Pivots (ZigZag)
-    pivot_dates = pivots.dropna().index
-    pivot_values = pivots.dropna().values
+    pivot_points = pivots.dropna()
+    pivot_dates = pivot_points.index
+    pivot_values = pivot_points.values
     
     if len(pivot_dates) > 0:
         fig.add_trace(go.Scatter(
@@ -32,11 +68,16 @@ def plot_interactive_chart(df: pd.DataFrame, pivots: pd.Series, moves: list, sym
         ))
 
     # 3. Measured Moves
+    # Collected first and added in one batch; each add_hline call would
+    # rebuild the figure's shape and annotation lists
+    traces = []
+    shapes = []
+    annotations = []
     for i, move in enumerate(moves):
         color = 'green' if move.direction == "Bullish" else 'red'
         
         # A-B-C Path
-        fig.add_trace(go.Scatter(
+        traces.append(go.Scatter(
             x=[move.start_idx, move.mid_idx, move.end_idx],
             y=[move.start_price, move.mid_price, move.end_price],
             mode='lines+markers+text',
@@ -49,23 +90,27 @@ def plot_interactive_chart(df: pd.DataFrame, pivots: pd.Series, moves: list, sym
         
         # Projection Line (C to Target)
         # We need a way to show the target. Since x-axis is time, we can just draw a horizontal line
-        # extending from C to the right.
+        # across the plot, labelled at the right edge (same as fig.add_hline).
+        shapes.append(dict(
+            type='line',
+            xref='x domain', x0=0, x1=1,
+            yref='y', y0=move.projected_target, y1=move.projected_target,
+            line=dict(color=color, dash='dot')
+        ))
+        annotations.append(dict(
+            text=f"Target: {move.projected_target:.2f}",
+            xref='x domain', x=1, xanchor='right',
+            yref='y', y=move.projected_target, yanchor='bottom',
+            showarrow=False
+        ))
         
-        fig.add_hline(
-            y=move.projected_target, 
-            line_dash="dot", 
-            line_color=color,
-            annotation_text=f"Target: {move.projected_target:.2f}",
-            annotation_position="top right"
-        )
+    if traces:
+        fig.add_traces(traces)
 
     fig.update_layout(
         title=f'Measured Move Analysis: {symbol}',
-        yaxis_title='Price',
-        xaxis_title='Date',
-        xaxis_rangeslider_visible=False,
-        template="plotly_dark",
-        height=600
+        shapes=shapes,
+        annotations=annotations
     )
     
     return fig